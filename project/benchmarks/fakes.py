@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Stand-ins used by the benchmarks: a fake psutil with a configurable process table,
+a headless curses screen and a recorded key stream for the editor.
+"""
+
+import curses
+import random
+import sys
+import types
+from collections import namedtuple
+
+_IOCounters = namedtuple('IOCounters', 'bytes_sent bytes_recv read_bytes write_bytes')
+_Memory = namedtuple('Memory', 'total used percent')
+_Freq = namedtuple('Freq', 'current min max')
+_Partition = namedtuple('Partition', 'device mountpoint fstype opts')
+_Usage = namedtuple('Usage', 'total used free percent')
+
+
+class FakeProcess:
+    __slots__ = ('info',)
+
+    def __init__(self, info):
+        self.info = info
+
+
+def make_fake_psutil(process_count=1000, partition_count=4, seed=0):
+    """Build a module that answers every psutil call made by SystemMonitor with synthetic data"""
+    rng = random.Random(seed)
+    users = ['root', 'daemon', 'www-data', 'postgres', 'user']
+    processes = [FakeProcess({
+        'pid': pid,
+        'name': f"proc-{pid}",
+        'cpu_percent': rng.random() * 100,
+        'memory_percent': rng.random() * 10,
+        'username': rng.choice(users),
+    }) for pid in range(1, process_count + 1)]
+    partitions = [_Partition(f"/dev/sd{chr(97 + i)}1", f"/mnt/disk{i}", 'ext4', 'rw')
+                  for i in range(partition_count)]
+    counter = [0]
+
+    def io_counters():
+        counter[0] += 4096
+        return _IOCounters(counter[0], counter[0] * 2, counter[0] * 3, counter[0] * 4)
+
+    psutil = types.ModuleType('psutil')
+    psutil.NoSuchProcess = type('NoSuchProcess', (Exception,), {})
+    psutil.AccessDenied = type('AccessDenied', (Exception,), {})
+    psutil.process_iter = lambda attrs=None: iter(processes)
+    psutil.net_io_counters = io_counters
+    psutil.disk_io_counters = io_counters
+    psutil.boot_time = lambda: 0.0
+    psutil.cpu_percent = lambda interval=None: 42.0
+    psutil.cpu_freq = lambda: _Freq(2400.0, 800.0, 3600.0)
+    psutil.cpu_count = lambda logical=True: 8
+    psutil.virtual_memory = lambda: _Memory(16 << 30, 6 << 30, 37.5)
+    psutil.swap_memory = lambda: _Memory(2 << 30, 1 << 28, 12.5)
+    psutil.disk_partitions = lambda all=False: partitions
+    psutil.disk_usage = lambda path: _Usage(500 << 30, 200 << 30, 300 << 30, 40.0)
+    return psutil
+
+
+def install_fake_psutil(process_count=1000):
+    """Make `import psutil` return the fake module (call before importing system_monitor)"""
+    sys.modules['psutil'] = make_fake_psutil(process_count)
+    return sys.modules['psutil']
+
+
+class HeadlessScreen:
+    """Minimal curses window that records drawing calls instead of touching a terminal"""
+
+    def __init__(self, height=50, width=200, keys=()):
+        self.height = height
+        self.width = width
+        self.keys = list(keys)
+        self.calls = 0
+
+    def getmaxyx(self):
+        return self.height, self.width
+
+    def addstr(self, y, x, text, attr=0):
+        if y >= self.height or x + len(text) > self.width:
+            raise curses.error("addstr outside the window")
+        self.calls += 1
+
+    def getch(self):
+        return self.keys.pop(0) if self.keys else -1
+
+    def clear(self): pass
+    def refresh(self): pass
+    def move(self, y, x): pass
+    def keypad(self, flag): pass
+    def timeout(self, delay): pass
+
+
+def make_headless_curses():
+    """A curses replacement for drawing code that needs color_pair without a terminal"""
+    module = types.ModuleType('curses')
+    for name in dir(curses):
+        if name.startswith(('KEY_', 'A_', 'COLOR_')):
+            setattr(module, name, getattr(curses, name))
+    module.error = curses.error
+    module.color_pair = lambda n: n << 8
+    return module
+
+
+def record_key_stream(count, seed=0):
+    """A reproducible sequence of editor key presses: mostly typing, with navigation and edits"""
+    rng = random.Random(seed)
+    navigation = [curses.KEY_UP, curses.KEY_DOWN, curses.KEY_LEFT, curses.KEY_RIGHT]
+    keys = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.75:
+            keys.append(rng.randint(32, 126))
+        elif roll < 0.85:
+            keys.append(rng.choice(navigation))
+        elif roll < 0.95:
+            keys.append(127)  # Backspace
+        else:
+            keys.append(10)   # Enter
+    return keys
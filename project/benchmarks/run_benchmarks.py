@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the filesystem, editor and system monitor hot paths.
+
+Generates synthetic workloads (directory trees, large text files, a fake process table and
+a recorded key stream), times each operation and writes the results as JSON. When a baseline
+file exists the results are compared against it and regressions make the run fail; without
+one the run fails too, so a missing baseline is never mistaken for a pass.
+
+    python project/benchmarks/run_benchmarks.py                   # quick run, compare to baseline
+    python project/benchmarks/run_benchmarks.py --save-baseline   # record a new baseline
+    python project/benchmarks/run_benchmarks.py --scale full -o results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCHMARK_DIR.parent))
+
+from fakes import (install_fake_psutil, make_fake_psutil, make_headless_curses, HeadlessScreen,
+                   record_key_stream)
+
+# psutil may not be installed, and the benchmarks must not depend on the host's process table
+install_fake_psutil()
+
+import system_monitor
+from filesystem import list_directory, tree_directory, remove_file
+from system_monitor import SystemMonitor
+from text_editor import NanoEditor
+
+DEFAULT_BASELINE = BENCHMARK_DIR / 'baseline.json'
+
+SCALES = {
+    'quick': {
+        'entries': [10**3, 10**4],
+        'file_sizes': [1 << 20, 16 << 20],
+        'processes': [1000, 5000],
+        'keys': 20000,
+        'frames': 20,
+        'repeat': 3,
+    },
+    'full': {
+        'entries': [10**3, 10**4, 10**5, 10**6],
+        'file_sizes': [1 << 20, 64 << 20, 1 << 30],
+        'processes': [1000, 10000, 50000],
+        'keys': 200000,
+        'frames': 100,
+        'repeat': 5,
+    },
+}
+
+FANOUT = 100    # entries per directory in generated trees
+
+
+# --- Workload generation ---
+
+def make_flat_directory(root, entries):
+    """A single directory with `entries` empty files (a tenth of them .py files)"""
+    root.mkdir(parents=True)
+    for i in range(entries):
+        (root / f"file{i:07d}{'.py' if i % 10 == 0 else '.txt'}").touch()
+    return root
+
+
+def make_tree(root, entries, fanout=FANOUT):
+    """A nested tree with about `entries` files and directories, `fanout` per directory"""
+    root.mkdir(parents=True)
+    created = 0
+    pending = [root]
+    while pending and created < entries:
+        directory = pending.pop(0)
+        for i in range(fanout):
+            if created >= entries:
+                break
+            if i % 10 == 0:
+                child = directory / f"dir{i:03d}"
+                child.mkdir()
+                pending.append(child)
+            else:
+                (directory / f"file{i:03d}.txt").touch()
+            created += 1
+    return root
+
+
+def make_text_file(path, size):
+    """A text file of about `size` bytes made of 80-column lines"""
+    line = ("lorem ipsum dolor sit amet " * 3)[:79] + "\n"
+    chunk = line * 1024
+    with open(path, 'w') as f:
+        written = 0
+        while written < size:
+            f.write(chunk)
+            written += len(chunk)
+    return path
+
+
+# --- Timing ---
+
+def measure(function, repeat, setup=None):
+    """Time function(setup()) `repeat` times; setup runs outside the timed region"""
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'max': max(timings),
+        'repeat': repeat,
+    }
+
+
+def consume(lines):
+    for _ in lines:
+        pass
+
+
+def bench_filesystem(workdir, scale, results, selected):
+    repeat = scale['repeat']
+    for entries in scale['entries']:
+        flat = make_flat_directory(workdir / f"flat-{entries}", entries)
+        nested = make_tree(workdir / f"tree-{entries}", entries)
+
+        name = f"list_directory[entries={entries}]"
+        if selected(name):
+            results[name] = measure(lambda _: consume(list_directory(flat, [], tty=False)), repeat)
+        name = f"list_directory -l[entries={entries}]"
+        if selected(name):
+            results[name] = measure(lambda _: consume(list_directory(flat, ['-l'], tty=True)), repeat)
+        name = f"tree_directory[entries={entries}]"
+        if selected(name):
+            results[name] = measure(lambda _: consume(tree_directory(nested, [], tty=False)), repeat)
+        name = f"remove_file -r[entries={entries}]"
+        if selected(name):
+            counter = iter(range(repeat))
+            results[name] = measure(
+                lambda name: remove_file(workdir, ['-r', name], interactive=False), repeat,
+                setup=lambda: make_tree(workdir / f"rm-{entries}-{next(counter)}", entries).name)
+
+        shutil.rmtree(flat)
+        shutil.rmtree(nested)
+
+
+def bench_editor(workdir, scale, results, selected):
+    repeat = scale['repeat']
+    screen = HeadlessScreen()
+    for size in scale['file_sizes']:
+        label = f"{size >> 20}MB"
+        path = make_text_file(workdir / f"text-{label}.txt", size)
+        editor = NanoEditor(path)
+
+        name = f"NanoEditor.load_file[{label}]"
+        if selected(name):
+            results[name] = measure(lambda _: editor.load_file(), repeat)
+        name = f"NanoEditor.save_file[{label}]"
+        if selected(name):
+            editor.load_file()
+            editor.file_path = workdir / f"saved-{label}.txt"
+            results[name] = measure(lambda _: editor.save_file(), repeat)
+            editor.file_path = path
+        name = f"NanoEditor.handle_key[{label},keys={scale['keys']}]"
+        if selected(name):
+            keys = record_key_stream(scale['keys'])
+
+            def replay(editor):
+                for key in keys:
+                    editor.handle_key(key, screen)
+
+            def fresh_editor():
+                fresh = NanoEditor(path)
+                fresh.load_file()
+                fresh.cursor_y = len(fresh.content) // 2
+                return fresh
+
+            results[name] = measure(replay, repeat, setup=fresh_editor)
+        path.unlink()
+
+
+def bench_monitor(scale, results, selected):
+    repeat = scale['repeat']
+    system_monitor.curses = make_headless_curses()
+    for count in scale['processes']:
+        system_monitor.psutil = make_fake_psutil(count)
+        monitor = SystemMonitor()
+
+        name = f"get_process_info[processes={count}]"
+        if selected(name):
+            results[name] = measure(lambda _: monitor.get_process_info(limit=40), repeat)
+        name = f"draw_dashboard[processes={count},frames={scale['frames']}]"
+        if selected(name):
+            screen = HeadlessScreen(height=50, width=200)
+
+            def draw_frames(_):
+                for _ in range(scale['frames']):
+                    monitor.draw_dashboard(screen)
+
+            results[name] = measure(draw_frames, repeat)
+
+
+# --- Reporting ---
+
+def compare(results, baseline, threshold):
+    """Print current vs baseline medians and return the names that regressed"""
+    regressions = []
+    print(f"\n{'benchmark':<55} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, result in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            print(f"{name:<55} {'-':>10} {result['median']:>9.4f}s {'new':>7}")
+            continue
+        ratio = result['median'] / previous['median'] if previous['median'] else float('inf')
+        flag = ""
+        if ratio > 1 + threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<55} {previous['median']:>9.4f}s {result['median']:>9.4f}s {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def load_baseline(path, scale):
+    """The baseline recorded at `scale`, or None (after printing why) when there is none to compare with"""
+    if not path.exists():
+        print(f"No baseline at {path}; nothing to compare against. "
+              f"Record one with --save-baseline.", file=sys.stderr)
+        return None
+    baseline = json.loads(path.read_text())
+    if baseline['meta'].get('scale') != scale:
+        print(f"Baseline {path} was recorded at scale '{baseline['meta'].get('scale')}', not '{scale}'; "
+              f"record one with --save-baseline --scale {scale}.", file=sys.stderr)
+        return None
+    return baseline
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the terminal's hot paths")
+    parser.add_argument('--scale', choices=SCALES, default='quick',
+                        help="workload sizes (full goes up to 10^6 entries and 1 GB files)")
+    parser.add_argument('--only', action='append', default=[],
+                        help="run only benchmarks whose reported name contains this text (repeatable)")
+    parser.add_argument('-o', '--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help="baseline JSON to compare against (default: %(default)s)")
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store these results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="allowed slowdown before a result counts as a regression (default: 0.25)")
+    parser.add_argument('--workdir', help="directory for generated workloads (default: a temp dir)")
+    options = parser.parse_args(argv)
+
+    # Check the baseline before spending minutes on workloads that could not be compared
+    baseline = None if options.save_baseline else load_baseline(Path(options.baseline), options.scale)
+
+    scale = SCALES[options.scale]
+    selected = lambda name: not options.only or any(part in name for part in options.only)
+    results = {}
+
+    workdir = Path(tempfile.mkdtemp(prefix='terminal-bench-', dir=options.workdir))
+    try:
+        bench_filesystem(workdir, scale, results, selected)
+        bench_editor(workdir, scale, results, selected)
+        bench_monitor(scale, results, selected)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    unmatched = [part for part in options.only if not any(part in name for name in results)]
+    if unmatched:
+        print(f"No benchmark name contains {', '.join(map(repr, unmatched))}", file=sys.stderr)
+        return 2
+
+    report = {
+        'meta': {
+            'scale': options.scale,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+    for name, result in results.items():
+        print(f"{name:<55} median {result['median']:.4f}s  min {result['min']:.4f}s")
+
+    if options.output:
+        Path(options.output).write_text(json.dumps(report, indent=2))
+    if options.save_baseline:
+        Path(options.baseline).write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline saved to {options.baseline}")
+        return 0
+
+    if baseline is None:
+        return 2
+    regressions = compare(results, baseline, options.threshold)
+    # With --only a partial run is expected; otherwise a vanished benchmark is worth a warning
+    missing = [] if options.only else [name for name in baseline['results'] if name not in results]
+    for name in missing:
+        print(f"{name:<55} {baseline['results'][name]['median']:>9.4f}s {'-':>10} {'missing':>7}")
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {options.threshold:.0%}")
+        return 1
+    if missing:
+        print(f"\n{len(missing)} baseline benchmark(s) did not run", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Command-line parsing for the terminal interface
+Handles quoting, pipes ('|'), redirection ('>', '>>', '<'), ';' separated commands
+and background commands ending in '&'.
+"""
+
+import re
+import shlex
+from dataclasses import dataclass, field
+
+# Operators, longest first so that '>>' wins over '>'
+OPERATORS = ('>>', '|', '>', '<', ';', '&')
+SPECIAL_CHARS = '|><;&'
+# Lines without any of these are plain whitespace-separated words
+NEEDS_TOKENIZING = re.compile(r'[\'"\\|><;&]')
+
+
+class ParseError(ValueError):
+    """Raised when a command line cannot be parsed"""
+
+
+@dataclass
+class Pipeline:
+    """One or more commands connected by '|', with optional redirection of its input/output"""
+    stages: list = field(default_factory=list)   # one argv list per command
+    stdin: str = None                            # file name after '<'
+    stdout: str = None                           # file name after '>' or '>>'
+    append: bool = False                         # True for '>>'
+    background: bool = False                     # True when terminated by '&'
+
+    def is_simple(self):
+        """True for a single command without redirection"""
+        return len(self.stages) == 1 and self.stdin is None and self.stdout is None
+
+    def name(self):
+        """Command names of the stages, e.g. 'tree | grep'"""
+        return " | ".join(argv[0].lower() for argv in self.stages)
+
+    def __str__(self):
+        stages = [shlex.join(argv) for argv in self.stages]
+        if self.stdin is not None and stages:
+            # '<' belongs to the first command, so it must stay there to parse back the same way
+            stages[0] += f" < {shlex.quote(self.stdin)}"
+        text = " | ".join(stages)
+        if self.stdout is not None:
+            text += f" {'>>' if self.append else '>'} {shlex.quote(self.stdout)}"
+        if self.background:
+            text += " &"
+        return text
+
+
+def tokenize(command_line):
+    """Split a command line into ('word', text) and ('op', operator) tokens"""
+    if not NEEDS_TOKENIZING.search(command_line):
+        return [('word', word) for word in command_line.split()]
+
+    tokens = []
+    word = []
+    in_word = False     # distinguishes an empty quoted word ("") from no word at all
+    i, n = 0, len(command_line)
+
+    def end_word():
+        nonlocal in_word
+        if in_word:
+            tokens.append(('word', "".join(word)))
+            word.clear()
+            in_word = False
+
+    while i < n:
+        char = command_line[i]
+        if char.isspace():
+            end_word()
+            i += 1
+        elif char == "'":
+            end = command_line.find("'", i + 1)
+            if end == -1:
+                raise ParseError("unterminated single quote")
+            word.append(command_line[i + 1:end])
+            in_word = True
+            i = end + 1
+        elif char == '"':
+            i += 1
+            while True:
+                if i >= n:
+                    raise ParseError("unterminated double quote")
+                char = command_line[i]
+                if char == '"':
+                    break
+                if char == '\\' and i + 1 < n and command_line[i + 1] in '"\\':
+                    i += 1
+                    char = command_line[i]
+                word.append(char)
+                i += 1
+            in_word = True
+            i += 1
+        elif char == '\\':
+            if i + 1 < n:
+                word.append(command_line[i + 1])
+            in_word = True
+            i += 2
+        elif char in SPECIAL_CHARS:
+            end_word()
+            op = next(op for op in OPERATORS if command_line.startswith(op, i))
+            tokens.append(('op', op))
+            i += len(op)
+        else:
+            word.append(char)
+            in_word = True
+            i += 1
+
+    end_word()
+    return tokens
+
+
+def parse_command_line(command_line):
+    """Parse a command line into a list of Pipelines, one per ';'- or '&'-terminated command"""
+    if not NEEDS_TOKENIZING.search(command_line):
+        argv = command_line.split()
+        return [Pipeline(stages=[argv])] if argv else []
+
+    pipelines = []
+    pipeline = Pipeline()
+    argv = []
+    tokens = tokenize(command_line)
+    i = 0
+
+    def end_stage(op):
+        if not argv:
+            raise ParseError(f"syntax error near '{op}'")
+        pipeline.stages.append(argv.copy())
+        argv.clear()
+
+    while i < len(tokens):
+        kind, value = tokens[i]
+        if kind == 'word':
+            argv.append(value)
+        elif value in ('>', '>>', '<'):
+            if i + 1 >= len(tokens) or tokens[i + 1][0] != 'word':
+                raise ParseError(f"syntax error: missing file name after '{value}'")
+            target = tokens[i + 1][1]
+            if value == '<':
+                if pipeline.stages:
+                    raise ParseError("'<' is only allowed on the first command of a pipeline")
+                pipeline.stdin = target
+            else:
+                pipeline.stdout = target
+                pipeline.append = (value == '>>')
+            i += 1
+        elif value == '|':
+            if pipeline.stdout is not None:
+                raise ParseError("'>' is only allowed on the last command of a pipeline")
+            end_stage(value)
+        elif value in (';', '&'):
+            if argv or pipeline.stages:
+                end_stage(value)
+                pipeline.background = (value == '&')
+                pipelines.append(pipeline)
+            elif value == '&' or pipeline.stdin is not None or pipeline.stdout is not None:
+                raise ParseError(f"syntax error near '{value}'")
+            pipeline = Pipeline()
+        i += 1
+
+    if argv or pipeline.stages:
+        end_stage('newline')
+        pipelines.append(pipeline)
+    elif pipeline.stdin is not None or pipeline.stdout is not None:
+        raise ParseError("syntax error: redirection without a command")
+    return pipelines
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Tab completion for the terminal interface
+Completes command names and filesystem paths relative to the terminal's current directory.
+"""
+
+import os
+from bisect import bisect_left
+from collections import OrderedDict
+
+from command_parser import tokenize, ParseError, SPECIAL_CHARS
+
+try:
+    import readline
+except ImportError:  # Windows without pyreadline
+    readline = None
+
+# Characters that end a word for completion purposes ('/' and '.' stay inside paths)
+COMPLETER_DELIMS = ' \t\n;|&<>'
+# Words after these start a new command
+COMMAND_SEPARATORS = (';', '|', '&')
+# Commands whose arguments can only be directories
+DIRECTORY_COMMANDS = {'cd', 'mkdir'}
+MAX_CACHED_DIRECTORIES = 64
+# Characters that must be backslash-escaped in an unquoted word
+ESCAPED_CHARS = ' \t\n\'"\\' + SPECIAL_CHARS
+
+
+def current_word(line):
+    """
+    Find the last (possibly unfinished) word of `line` with the same quoting rules as the
+    command parser. Returns (start index, open quote character or '', unquoted text).
+    """
+    start, quote, word, in_word = len(line), '', [], False
+    i = 0
+    while i < len(line):
+        char = line[i]
+        if quote == "'":
+            if char == "'":
+                quote = ''
+            else:
+                word.append(char)
+        elif quote == '"':
+            if char == '"':
+                quote = ''
+            elif char == '\\' and i + 1 < len(line) and line[i + 1] in '"\\':
+                i += 1
+                word.append(line[i])
+            else:
+                word.append(char)
+        elif char.isspace() or char in SPECIAL_CHARS:
+            start, word, in_word = len(line), [], False
+        else:
+            if not in_word:
+                start, in_word = i, True
+            if char in '\'"':
+                quote = char
+            elif char == '\\':
+                if i + 1 < len(line):
+                    i += 1
+                    word.append(line[i])
+            else:
+                word.append(char)
+        i += 1
+    return start, quote, "".join(word)
+
+
+def quote_word(path, quote, is_dir):
+    """Write a completed path back in the quoting style the user started with"""
+    if quote == "'":
+        text = "'" + path.replace("'", "'\\''")
+    elif quote == '"':
+        text = '"' + path.replace('\\', '\\\\').replace('"', '\\"')
+    else:
+        text = "".join('\\' + char if char in ESCAPED_CHARS else char for char in path)
+    return text + '/' if is_dir else text + quote + ' '
+
+
+class DirectoryIndex:
+    """Sorted names of one directory, so any prefix is found with two binary searches"""
+
+    def __init__(self, path, mtime_ns):
+        self.mtime_ns = mtime_ns
+        self.names = []
+        self.directories = set()
+        with os.scandir(path) as it:
+            for entry in it:
+                self.names.append(entry.name)
+                try:
+                    if entry.is_dir():
+                        self.directories.add(entry.name)
+                except OSError:
+                    pass
+        self.names.sort()
+
+    def matches(self, prefix, directories_only=False):
+        """Yield (name, is_dir) for every entry starting with prefix"""
+        start = bisect_left(self.names, prefix)
+        end = bisect_left(self.names, prefix + '\U0010ffff', start)
+        show_hidden = prefix.startswith('.')
+        for name in self.names[start:end]:
+            is_dir = name in self.directories
+            if (show_hidden or not name.startswith('.')) and (is_dir or not directories_only):
+                yield name, is_dir
+
+
+class Completer:
+    """readline completer backed by per-directory indexes that are rebuilt when a directory changes"""
+
+    def __init__(self, commands, get_current_path):
+        self.commands = sorted(commands)
+        self.get_current_path = get_current_path
+        self.indexes = OrderedDict()   # directory -> DirectoryIndex, least recently used first
+        self.matches = []
+
+    def index(self, directory):
+        """Return the index for a directory, rebuilding it only if its mtime changed"""
+        key = str(directory)
+        mtime_ns = os.stat(key).st_mtime_ns
+        index = self.indexes.get(key)
+        if index is None or index.mtime_ns != mtime_ns:
+            index = self.indexes[key] = DirectoryIndex(key, mtime_ns)
+        self.indexes.move_to_end(key)
+        while len(self.indexes) > MAX_CACHED_DIRECTORIES:
+            self.indexes.popitem(last=False)
+        return index
+
+    def complete_command(self, text):
+        start = bisect_left(self.commands, text)
+        end = bisect_left(self.commands, text + '\U0010ffff', start)
+        return [command + ' ' for command in self.commands[start:end]]
+
+    def complete_path(self, text, directories_only=False):
+        """(path, is_dir) for every entry completing `text`, an unquoted path"""
+        head, prefix = os.path.split(text)
+        # No '~' expansion: the parser and built-ins take paths literally, so completions must too
+        directory = self.get_current_path() / head if head else self.get_current_path()
+        try:
+            index = self.index(directory)
+        except OSError:
+            return []
+        return [(os.path.join(head, name), is_dir)
+                for name, is_dir in index.matches(prefix, directories_only)]
+
+    def candidates(self, line, begin):
+        """
+        Completions for the text from `begin` to the end of `line` (the line up to the cursor).
+        readline splits at every space, so an escaped or quoted word can start before `begin`:
+        the whole word is completed unquoted, quoted again, and the part before `begin` cut off.
+        """
+        start, quote, word = current_word(line)
+        try:
+            tokens = tokenize(line[:start])
+        except ParseError:
+            return []
+
+        # Words of the command this argument belongs to
+        words = []
+        for kind, value in tokens:
+            if kind == 'op' and value in COMMAND_SEPARATORS:
+                words = []
+            elif kind == 'word':
+                words.append(value)
+        if not words and not quote:
+            return self.complete_command(line[begin:])
+
+        directories_only = bool(words) and words[0].lower() in DIRECTORY_COMMANDS
+        typed = line[start:begin]
+        matches = []
+        for path, is_dir in self.complete_path(word, directories_only):
+            completion = quote_word(path, quote, is_dir)
+            if completion.startswith(typed):
+                matches.append(completion[len(typed):])
+        return matches
+
+    def complete(self, text, state):
+        """readline completion function"""
+        if state == 0:
+            try:
+                line = readline.get_line_buffer()[:readline.get_endidx()]
+                self.matches = self.candidates(line, readline.get_begidx())
+            except Exception:
+                self.matches = []
+        return self.matches[state] if state < len(self.matches) else None
+
+    def install(self):
+        """Register with readline; returns False when readline is unavailable"""
+        if readline is None:
+            return False
+        readline.set_completer(self.complete)
+        readline.set_completer_delims(COMPLETER_DELIMS)
+        if 'libedit' in (readline.__doc__ or ''):
+            readline.parse_and_bind('bind ^I rl_complete')
+        else:
+            readline.parse_and_bind('tab: complete')
+        return True
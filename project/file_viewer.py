@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Streaming file viewers for the terminal interface: cat, head, tail and tail -f
+Memory use does not depend on the size of the file.
+"""
+
+import ctypes
+import ctypes.util
+import itertools
+import mmap
+import os
+import select
+import struct
+import sys
+import time
+from collections import deque
+
+from filesystem import read_lines, ExitStatus
+
+DEFAULT_LINE_COUNT = 10
+READ_BLOCK_SIZE = 64 << 10          # bytes read per call while following a file
+MAX_LINE_LENGTH = 1 << 20           # longer runs without a newline are emitted in pieces
+FOLLOW_CHECK_INTERVAL = 1.0         # seconds between checks for `kill` while waiting for data
+
+# inotify event masks (see inotify(7))
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+def _decode(line):
+    return line.decode('utf-8', errors='replace').rstrip('\r')
+
+
+def _parse_options(command, args, tail=False):
+    """
+    Parse -n N / -nN / -N (and for tail, -f and -n +N meaning 'from line N on').
+    Returns (count, from_start, follow, files) or None after printing an error.
+    """
+    count, from_start, follow, files = DEFAULT_LINE_COUNT, False, False, []
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        try:
+            if arg.startswith('-n'):
+                value = arg[2:] or args.pop(0)
+                from_start = value.startswith('+')
+                if from_start and not tail:
+                    raise ValueError(value)
+                count = int(value)
+            elif arg == '-f' and tail:
+                follow = True
+            elif arg.startswith('-') and arg[1:].isdigit():
+                count = int(arg[1:])
+            elif arg.startswith('-') and arg != '-':
+                print(f"{command}: unknown option '{arg}'")
+                return None
+            else:
+                files.append(arg)
+        except (IndexError, ValueError):
+            print(f"{command}: invalid line count")
+            return None
+    if count < 0:
+        print(f"{command}: invalid line count")
+        return None
+    return count, from_start, follow, files
+
+
+def cat_file(current_path, args, stdin=None, status=None):
+    """Yield the lines of each file in turn, or pass stdin through when no file is given"""
+    status = status or ExitStatus()
+    if not args:
+        if stdin is None:
+            print("cat: missing file operand")
+            status.fail(2)
+            return
+        yield from stdin
+        return
+
+    for name in args:
+        try:
+            yield from read_lines(current_path / name)
+        except FileNotFoundError:
+            print(f"cat: {name}: No such file or directory")
+            status.fail()
+        except IsADirectoryError:
+            print(f"cat: {name}: Is a directory")
+            status.fail()
+        except OSError as e:
+            print(f"cat: {name}: {e.strerror}")
+            status.fail()
+
+
+def head_file(current_path, args, stdin=None, status=None):
+    """Yield the first N lines of each file (or of stdin); reading stops after line N"""
+    status = status or ExitStatus()
+    options = _parse_options('head', args)
+    if options is None:
+        status.fail(2)
+        return
+    count, _, _, files = options
+
+    if not files:
+        if stdin is None:
+            print("head: missing file operand")
+            status.fail(2)
+            return
+        yield from itertools.islice(stdin, count)
+        return
+
+    for i, name in enumerate(files):
+        if len(files) > 1:
+            if i > 0:
+                yield ""
+            yield f"==> {name} <=="
+        try:
+            lines = read_lines(current_path / name)
+            yield from itertools.islice(lines, count)
+            lines.close()
+        except OSError as e:
+            print(f"head: {name}: {e.strerror}")
+            status.fail()
+
+
+def _tail_offset(path, count):
+    """
+    Byte offset where the last `count` lines of a file start, found by searching backwards
+    for newlines through an mmap of the file, so only the tail of the file is ever paged in.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0 or count == 0:
+            return size
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # A trailing newline ends the last line rather than starting an empty one
+            position = size - 1 if mm[size - 1] == ord('\n') else size
+            for _ in range(count):
+                position = mm.rfind(b'\n', 0, position)
+                if position == -1:
+                    return 0
+            return position + 1
+
+
+def _select(lines, count, from_start):
+    """The last `count` of any iterable of lines, or with from_start every line from number `count` on"""
+    if from_start:
+        return itertools.islice(lines, max(count - 1, 0), None)
+    return deque(lines, maxlen=count)
+
+
+def _lines_from(path, start):
+    """Yield the lines of a file from line `start` (1-based) on and return the offset reading stopped at"""
+    with open(path, 'rb') as f:
+        for number, line in enumerate(f, 1):
+            if number >= start:
+                yield _decode(line.rstrip(b'\n'))
+        return f.tell()
+
+
+def _tail_lines(path, count):
+    """Yield the last `count` lines of a regular file and return the offset reading stopped at"""
+    offset = _tail_offset(path, count)
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        for line in f:
+            yield _decode(line.rstrip(b'\n'))
+        return f.tell()
+
+
+class DirectoryWatch:
+    """inotify watch on a directory, used to sleep until a given file in it changes (Linux only)"""
+
+    _libc = None
+
+    def __init__(self, directory, name):
+        self.name = os.fsencode(name)
+        self.fd = -1
+        if not sys.platform.startswith('linux'):
+            return
+        try:
+            if DirectoryWatch._libc is None:
+                DirectoryWatch._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            libc = DirectoryWatch._libc
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError):
+            return
+        if fd < 0:
+            return
+        if libc.inotify_add_watch(fd, os.fsencode(str(directory)), WATCH_MASK) < 0:
+            os.close(fd)
+            return
+        self.fd = fd
+
+    @property
+    def available(self):
+        return self.fd >= 0
+
+    def _drain(self):
+        """Read all pending events; True if any of them concerns the watched file"""
+        relevant = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 << 10)
+            except BlockingIOError:
+                return relevant
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+                offset += EVENT_HEADER.size
+                if data[offset:offset + length].rstrip(b'\0') == self.name:
+                    relevant = True
+                offset += length
+
+    def wait(self, timeout):
+        """Block until the watched file changes or `timeout` seconds pass"""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if readable and self._drain():
+                return
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _follow(path, offset, status, stop=None):
+    """
+    Yield lines appended to a file from `offset` on, forever (until `stop` is set).
+    Handles truncation and rotation (the name pointing to a new file). Waits with inotify
+    where available and falls back to polling; `status.idle()` flushes the output first.
+    """
+    watch = DirectoryWatch(path.parent, path.name)
+    f = open(path, 'rb')
+    f.seek(offset)
+    pending = b''
+    try:
+        while stop is None or not stop.is_set():
+            chunk = f.read(READ_BLOCK_SIZE)
+            if chunk:
+                pending += chunk
+                *lines, pending = pending.split(b'\n')
+                for line in lines:
+                    yield _decode(line)
+                if len(pending) > MAX_LINE_LENGTH:
+                    yield _decode(pending)
+                    pending = b''
+                continue
+
+            # At end of file: check whether the file was replaced or truncated
+            try:
+                current = os.stat(path)
+            except FileNotFoundError:
+                current = None
+            if current is not None and current.st_ino != os.fstat(f.fileno()).st_ino:
+                if pending:
+                    yield _decode(pending)
+                    pending = b''
+                print(f"tail: '{path.name}' has been replaced; following new file")
+                f.close()
+                f = open(path, 'rb')
+                continue
+            if current is not None and current.st_size < f.tell():
+                print(f"tail: {path.name}: file truncated")
+                f.seek(0)
+                pending = b''
+                continue
+
+            # Nothing new yet: make what we have written visible before sleeping
+            status.idle()
+            if watch.available:
+                watch.wait(FOLLOW_CHECK_INTERVAL)
+            elif stop is not None:
+                stop.wait(FOLLOW_CHECK_INTERVAL / 4)
+            else:
+                time.sleep(FOLLOW_CHECK_INTERVAL / 4)
+    finally:
+        f.close()
+        watch.close()
+
+
+def tail_file(current_path, args, stdin=None, stop=None, status=None):
+    """
+    Yield the last N lines of each file (or of stdin), or with -n +N everything from line N on.
+    With -f, keep yielding lines as they are appended to the file until interrupted or `stop` is set.
+    """
+    status = status or ExitStatus()
+    options = _parse_options('tail', args, tail=True)
+    if options is None:
+        status.fail(2)
+        return
+    count, from_start, follow, files = options
+
+    if not files:
+        if stdin is None:
+            print("tail: missing file operand")
+            status.fail(2)
+            return
+        yield from _select(stdin, count, from_start)
+        return
+    if follow and len(files) > 1:
+        print("tail: -f follows a single file")
+        status.fail(2)
+        return
+
+    for i, name in enumerate(files):
+        path = current_path / name
+        if len(files) > 1:
+            if i > 0:
+                yield ""
+            yield f"==> {name} <=="
+        try:
+            if path.is_dir():
+                print(f"tail: {name}: Is a directory")
+                status.fail()
+                continue
+            if path.is_file():
+                offset = yield from (_lines_from(path, count) if from_start else _tail_lines(path, count))
+            else:
+                # Pipes and devices cannot be mapped: keep a bounded window of lines instead
+                yield from _select(read_lines(path), count, from_start)
+                continue
+        except OSError as e:
+            print(f"tail: {name}: {e.strerror}")
+            status.fail()
+            continue
+
+        if follow:
+            yield from _follow(path, offset, status, stop)
@@ -3,8 +3,14 @@
 File system operations for the terminal interface
 """
 
+import errno
 import os
 import shutil
+import stat
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # ANSI color codes
@@ -12,9 +18,41 @@ BLUE = "\033[94m"   # Directories
 RED = "\033[91m"    # Python / Shell files
 RESET = "\033[0m"   # Reset to default
 
+# cp / mv tuning
+KERNEL_COPY_CHUNK = 64 << 20        # bytes per copy_file_range / sendfile call
+COPY_BUFFER_SIZE = 1 << 20          # read/write fallback buffer
+COPY_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+PROGRESS_INTERVAL = 0.25            # seconds between progress line updates
 
-def colorize(item: Path) -> str:
+# Errors that mean "this kernel copy mechanism is not available here", not "the copy failed"
+_UNSUPPORTED_COPY_ERRORS = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP,
+                            errno.ENOTSUP, errno.EBADF, errno.EPERM}
+
+
+class ExitStatus:
+    """
+    Exit status of a streaming command or pipeline; generators call fail() when they hit an error.
+    Generators that are about to block waiting for input call idle(), which flushes the output.
+    """
+
+    def __init__(self):
+        self.code = 0
+        self.on_idle = None   # set by whoever writes the output, e.g. to out.flush
+
+    def fail(self, code=1):
+        # The first failure decides the status
+        if not self.code:
+            self.code = code
+
+    def idle(self):
+        if self.on_idle is not None:
+            self.on_idle()
+
+
+def colorize(item: Path, color=True) -> str:
     """Return colored string based on file type"""
+    if not color:
+        return item.name
     if item.is_dir():
         return f"{BLUE}{item.name}{RESET}"
     elif item.suffix in ['.py', '.sh']:
@@ -23,56 +61,152 @@ def colorize(item: Path) -> str:
         return item.name
 
 
-def list_directory(path, args):
-    """List directory contents"""
+def list_directory(path, args, tty=True, status=None):
+    """
+    Yield directory listing lines.
+    On a terminal the output is colored and the simple listing fits on one line;
+    otherwise (pipes, redirection) it is plain text with one entry per line.
+    """
+    status = status or ExitStatus()
     try:
         if args and args[0] == '-l':
             # Long format listing
             for item in sorted(path.iterdir()):
                 if item.is_dir():
-                    print(f"d {' ' * 8} {colorize(item)}")
+                    yield f"d {' ' * 8} {colorize(item, tty)}"
                 else:
-                    print(f"- {' ' * 8} {colorize(item)}")
-        else:
+                    yield f"- {' ' * 8} {colorize(item, tty)}"
+        elif tty:
             # Simple listing
             items = [colorize(item) for item in sorted(path.iterdir())]
-            print(" ".join(items))
+            yield " ".join(items)
+        else:
+            for item in sorted(path.iterdir()):
+                yield item.name
     except PermissionError:
         print("Permission denied")
+        status.fail()
 
 
-def tree_directory(path, args, prefix="", is_last=True):
-    """Recursively display directory tree structure"""
+def tree_directory(path, args, prefix="", is_last=True, tty=True, status=None):
+    """Recursively yield the lines of a directory tree structure"""
+    status = status or ExitStatus()
     try:
         items = sorted(path.iterdir())
         item_count = len(items)
 
-        # Print current directory/file
+        # Current directory/file
         if path == Path('.'):  # Root of tree
-            print(path.name)
+            yield path.name
         else:
             connector = "└── " if is_last else "├── "
-            print(f"{prefix}{connector}{colorize(path)}")
+            yield f"{prefix}{connector}{colorize(path, tty)}"
 
-        # Print children with proper tree structure
+        # Children with proper tree structure
         for i, item in enumerate(items):
             is_last_child = (i == item_count - 1)
             new_prefix = prefix + ("    " if is_last else "│   ")
 
             if item.is_dir():
-                tree_directory(item, args, new_prefix, is_last_child)
+                yield from tree_directory(item, args, new_prefix, is_last_child, tty, status)
             else:
                 file_connector = "└── " if is_last_child else "├── "
-                print(f"{new_prefix}{file_connector}{colorize(item)}")
+                yield f"{new_prefix}{file_connector}{colorize(item, tty)}"
     except PermissionError:
         print("Permission denied")
+        status.fail()
+
+
+def _parse_flags(command, args, valid):
+    """Split combined short flags (e.g. -rf) from operands; returns (flags, operands) or None"""
+    flags = "".join(arg[1:] for arg in args if arg.startswith('-'))
+    invalid = set(flags) - set(valid)
+    if invalid:
+        print(f"{command}: invalid option -- '{invalid.pop()}'")
+        return None
+    return flags, [arg for arg in args if not arg.startswith('-')]
+
+
+def format_size(size):
+    """Converts bytes to a human-readable size (K, M, G, T)"""
+    for unit in ('B', 'K', 'M', 'G'):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}T"
+
+
+def _directory_usage(path, summarize, human, status, stop=None):
+    """
+    Yield a usage line for every directory below path (post-order) and return the total size.
+    Stops early, without further lines, once `stop` is set.
+    """
+    total = 0
+    if stop is not None and stop.is_set():
+        return total
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        total += yield from _directory_usage(entry.path, summarize, human, status, stop)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    status.fail()
+                    continue
+    except PermissionError:
+        print(f"du: {path}: Permission denied")
+        status.fail()
+
+    if not summarize and (stop is None or not stop.is_set()):
+        yield f"{format_size(total) if human else total // 1024}\t{path}"
+    return total
+
+
+def disk_usage(current_path, args, status=None, stop=None):
+    """
+    Yield disk usage per directory (-s: total only, -h: human-readable sizes).
+    The walk checks `stop` (a threading.Event) at every directory and ends once it is set.
+    """
+    status = status or ExitStatus()
+    parsed = _parse_flags('du', args, 'sh')
+    if parsed is None:
+        status.fail(2)
+        return
+    flags, targets = parsed
+    summarize = 's' in flags
+    human = 'h' in flags
+    targets = targets or ['.']
+
+    for target in targets:
+        path = current_path / target
+        if not path.exists():
+            print(f"du: {target}: No such file or directory")
+            status.fail()
+            continue
+        if path.is_dir():
+            total = yield from _directory_usage(str(path), summarize, human, status, stop)
+        else:
+            total = path.stat().st_size
+        if stop is not None and stop.is_set():
+            return
+        if summarize or not path.is_dir():
+            yield f"{format_size(total) if human else total // 1024}\t{path}"
+
+
+def read_lines(path):
+    """Lazily yield the lines of a text file without their line endings"""
+    with open(path, 'r', errors='replace') as f:
+        for line in f:
+            yield line.rstrip('\n\r')
 
 
 def change_directory(current_path, args):
-    """Change current directory"""
+    """Return the new current directory, or None (after printing why) if it cannot be changed"""
     if not args:
         print("cd: missing argument")
-        return current_path
+        return None
 
     target = args[0]
 
@@ -87,10 +221,10 @@ def change_directory(current_path, args):
                 return new_path
             else:
                 print(f"cd: {target}: No such directory")
-                return current_path
+                return None
     except Exception as e:
         print(f"cd: {e}")
-        return current_path
+        return None
 
 
 def make_directory(current_path, args):
@@ -109,26 +243,265 @@ def make_directory(current_path, args):
         return False
 
 
-def remove_file(current_path, args):
-    """Remove files and directories"""
-    if not args:
+def remove_file(current_path, args, interactive=True):
+    """Remove files and directories (-r removes directories without asking, -f never asks)"""
+    flags = "".join(arg[1:] for arg in args if arg.startswith('-'))
+    names = [arg for arg in args if not arg.startswith('-')]
+    if set(flags) - set('rRf'):
+        print(f"rm: invalid option -- '{(set(flags) - set('rRf')).pop()}'")
+        return False
+    recursive = 'r' in flags or 'R' in flags
+    force = 'f' in flags
+
+    if not names:
         print("rm: missing argument")
         return False
 
+    ok = True
     try:
-        for item_name in args:
+        for item_name in names:
             item_path = current_path / item_name
             if item_path.exists():
                 if item_path.is_dir():
-                    confirm = input(f"Remove directory '{item_name}'? (y/N): ")
-                    if confirm.lower() != 'y':
-                        continue
+                    if not recursive:
+                        if force or not interactive:
+                            print(f"rm: {item_name}: is a directory (use -r)")
+                            ok = False
+                            continue
+                        confirm = input(f"Remove directory '{item_name}'? (y/N): ")
+                        if confirm.lower() != 'y':
+                            continue
                     shutil.rmtree(item_path)
                 else:
                     item_path.unlink()
-            else:
+            elif not force:
                 print(f"rm: {item_name}: No such file or directory")
-        return True
+                ok = False
+        return ok
     except Exception as e:
         print(f"rm: {e}")
         return False
+
+
+class CopyProgress:
+    """Throttled progress line (bytes, files, throughput) on stderr, shared by copy workers"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled and sys.stderr.isatty()
+        self.lock = threading.Lock()
+        self.start = time.perf_counter()
+        self.last_update = 0.0
+        self.bytes = 0
+        self.files = 0
+        self.shown = False
+
+    def _line(self, now):
+        elapsed = max(now - self.start, 1e-9)
+        return (f"{self.files} file(s), {format_size(self.bytes)} in {elapsed:.1f}s "
+                f"({format_size(self.bytes / elapsed)}/s)")
+
+    def add(self, size, files=0):
+        with self.lock:
+            self.bytes += size
+            self.files += files
+            if not self.enabled:
+                return
+            now = time.perf_counter()
+            if now - self.last_update >= PROGRESS_INTERVAL:
+                self.last_update = now
+                self.shown = True
+                sys.stderr.write(f"\r{self._line(now)}\033[K")
+                sys.stderr.flush()
+
+    def finish(self):
+        if self.shown:
+            sys.stderr.write(f"\r{self._line(time.perf_counter())}\033[K\n")
+            sys.stderr.flush()
+
+
+def _copy_file_contents(source, destination, progress):
+    """
+    Copy one file's data, preferring in-kernel transfers: copy_file_range (which can also
+    reflink or offload on filesystems that support it), then sendfile, then a large-buffer
+    read/write loop.
+    """
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        infd, outfd = src.fileno(), dst.fileno()
+        copied = 0
+
+        if hasattr(os, 'copy_file_range'):
+            try:
+                while True:
+                    sent = os.copy_file_range(infd, outfd, KERNEL_COPY_CHUNK)
+                    if sent == 0:
+                        return
+                    copied += sent
+                    progress.add(sent)
+            except OSError as e:
+                if copied or e.errno not in _UNSUPPORTED_COPY_ERRORS:
+                    raise
+
+        if hasattr(os, 'sendfile') and sys.platform.startswith('linux'):
+            try:
+                while True:
+                    sent = os.sendfile(outfd, infd, copied, KERNEL_COPY_CHUNK)
+                    if sent == 0:
+                        return
+                    copied += sent
+                    progress.add(sent)
+            except OSError as e:
+                if copied or e.errno not in _UNSUPPORTED_COPY_ERRORS:
+                    raise
+
+        buffer = bytearray(COPY_BUFFER_SIZE)
+        view = memoryview(buffer)
+        while True:
+            read = src.readinto(buffer)
+            if not read:
+                return
+            dst.write(view[:read])
+            progress.add(read)
+
+
+def _copy_single_file(source, destination, progress, follow_symlinks=False):
+    """Copy data and metadata (mode, timestamps) of one file; symlinks are recreated as links"""
+    if not follow_symlinks and os.path.islink(source):
+        os.symlink(os.readlink(source), destination)
+    else:
+        _copy_file_contents(source, destination, progress)
+        shutil.copystat(source, destination)
+    progress.add(0, files=1)
+
+
+def _copy_tree(source, destination, progress):
+    """
+    Copy a directory tree: directories are created while walking, file copies run on a worker
+    pool, and directory metadata is applied last (deepest first) so copying does not change it.
+    FIFOs are recreated empty; sockets and device files are skipped, and False is returned.
+    """
+    ok = True
+    directories = []
+    with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+        futures = []
+        pending = [(source, destination)]
+        while pending:
+            src_dir, dst_dir = pending.pop()
+            os.mkdir(dst_dir)
+            directories.append((src_dir, dst_dir))
+            with os.scandir(src_dir) as entries:
+                for entry in entries:
+                    target = os.path.join(dst_dir, entry.name)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, target))
+                    elif entry.is_symlink() or entry.is_file(follow_symlinks=False):
+                        futures.append(pool.submit(_copy_single_file, entry.path, target, progress))
+                    elif stat.S_ISFIFO(entry.stat(follow_symlinks=False).st_mode):
+                        # Opening a FIFO would block until something writes to it
+                        os.mkfifo(target)
+                        shutil.copystat(entry.path, target)
+                    else:
+                        print(f"cp: {entry.path}: skipping special file")
+                        ok = False
+        for future in futures:
+            future.result()
+
+    for src_dir, dst_dir in reversed(directories):
+        shutil.copystat(src_dir, dst_dir)
+    return ok
+
+
+def _copy_targets(current_path, command, operands):
+    """
+    Resolve 'src... dst' operands into (source, target) pairs. Problems are printed; the second
+    return value is False if any operand had to be skipped.
+    """
+    if len(operands) < 2:
+        print(f"{command}: missing file operand")
+        return [], False
+
+    *sources, destination = operands
+    destination = current_path / destination
+    if len(sources) > 1 and not destination.is_dir():
+        print(f"{command}: target '{operands[-1]}' is not a directory")
+        return [], False
+
+    pairs = []
+    for name in sources:
+        source = current_path / name
+        if not source.exists() and not source.is_symlink():
+            print(f"{command}: {name}: No such file or directory")
+            continue
+        target = destination / source.name if destination.is_dir() else destination
+        if target.exists() and os.path.samefile(source, target):
+            print(f"{command}: '{name}' and '{target}' are the same file")
+            continue
+        if source.is_dir() and target.resolve().is_relative_to(source.resolve()):
+            print(f"{command}: cannot copy '{name}' into itself")
+            continue
+        pairs.append((source, target))
+    return pairs, len(pairs) == len(sources)
+
+
+def copy_file(current_path, args, show_progress=True):
+    """Copy files, or directory trees with -r, preserving permissions and timestamps"""
+    parsed = _parse_flags('cp', args, 'rRaf')
+    if parsed is None:
+        return False
+    flags, operands = parsed
+    recursive = bool(set(flags) & set('rRa'))
+    pairs, ok = _copy_targets(current_path, 'cp', operands)
+
+    progress = CopyProgress(show_progress)
+    try:
+        for source, target in pairs:
+            if source.is_dir():
+                if not recursive:
+                    print(f"cp: -r not specified; omitting directory '{source.name}'")
+                    ok = False
+                elif target.exists():
+                    print(f"cp: {target}: already exists")
+                    ok = False
+                else:
+                    ok = _copy_tree(str(source), str(target), progress) and ok
+            else:
+                _copy_single_file(str(source), str(target), progress, follow_symlinks=True)
+        return ok
+    except Exception as e:
+        print(f"cp: {e}")
+        return False
+    finally:
+        progress.finish()
+
+
+def move_file(current_path, args, show_progress=True):
+    """Move files and directories: a rename on the same device, otherwise copy and delete"""
+    parsed = _parse_flags('mv', args, 'f')
+    if parsed is None:
+        return False
+    pairs, ok = _copy_targets(current_path, 'mv', parsed[1])
+
+    progress = CopyProgress(show_progress)
+    try:
+        for source, target in pairs:
+            try:
+                os.replace(source, target)
+                continue
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    raise
+            # Different filesystem: fall back to copy + delete
+            if source.is_dir() and not source.is_symlink():
+                if _copy_tree(str(source), str(target), progress):
+                    shutil.rmtree(source)
+                else:
+                    print(f"mv: not removing '{source.name}': some entries were not copied")
+                    ok = False
+            else:
+                _copy_single_file(str(source), str(target), progress)
+                source.unlink()
+        return ok
+    except Exception as e:
+        print(f"mv: {e}")
+        return False
+    finally:
+        progress.finish()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Command timing, profiling and latency statistics for the terminal interface
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Histogram bucket b counts latencies in [2^(b-1), 2^b) microseconds; 40 buckets reach ~6 days
+BUCKET_COUNT = 40
+
+
+def _format_seconds(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.0f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
+
+
+class LatencyStats:
+    """Per-command latency histograms with power-of-two buckets, cheap enough to always be on"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.commands = {}  # name -> {'count', 'total', 'max', 'buckets'}
+
+    def record(self, name, seconds):
+        bucket = min(int(seconds * 1e6).bit_length(), BUCKET_COUNT - 1)
+        with self.lock:
+            entry = self.commands.get(name)
+            if entry is None:
+                entry = self.commands[name] = {'count': 0, 'total': 0.0, 'max': 0.0,
+                                               'buckets': [0] * BUCKET_COUNT}
+            entry['count'] += 1
+            entry['total'] += seconds
+            if seconds > entry['max']:
+                entry['max'] = seconds
+            entry['buckets'][bucket] += 1
+
+    @staticmethod
+    def percentile(entry, fraction):
+        """Upper bound (in seconds) of the bucket holding the given fraction of calls"""
+        target = fraction * entry['count']
+        seen = 0
+        for bucket, count in enumerate(entry['buckets']):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) / 1e6, entry['max'])
+        return entry['max']
+
+    def lines(self):
+        """Yield a table of the recorded commands, slowest total time first"""
+        with self.lock:
+            entries = sorted(self.commands.items(), key=lambda item: item[1]['total'], reverse=True)
+            entries = [(name, dict(entry, buckets=entry['buckets'][:])) for name, entry in entries]
+        if not entries:
+            yield "No commands recorded yet."
+            return
+
+        yield f"{'COMMAND':<24} {'COUNT':>7} {'TOTAL':>9} {'MEAN':>9} {'P50':>9} {'P99':>9} {'MAX':>9}"
+        for name, entry in entries:
+            yield (f"{name[:24]:<24} {entry['count']:>7} "
+                   f"{_format_seconds(entry['total']):>9} "
+                   f"{_format_seconds(entry['total'] / entry['count']):>9} "
+                   f"{'<' + _format_seconds(self.percentile(entry, 0.5)):>9} "
+                   f"{'<' + _format_seconds(self.percentile(entry, 0.99)):>9} "
+                   f"{_format_seconds(entry['max']):>9}")
+
+    def reset(self):
+        with self.lock:
+            self.commands.clear()
+
+    def export(self, path):
+        """Write the histograms as JSON"""
+        with self.lock:
+            data = {'bucket_unit': 'microseconds, bucket b = [2^(b-1), 2^b)', 'commands': self.commands}
+            text = json.dumps(data, indent=2)
+        with open(path, 'w') as f:
+            f.write(text)
+
+    def merge(self, path):
+        """
+        Add the histograms from a file written by export(), e.g. from earlier sessions.
+        A file that cannot be read or is not in that format is ignored with a warning.
+        """
+        try:
+            with open(path, 'r') as f:
+                commands = json.load(f)['commands']
+            loaded = {name: {'count': int(other['count']), 'total': float(other['total']),
+                             'max': float(other['max']),
+                             'buckets': [int(count) for count in other['buckets'][:BUCKET_COUNT]]}
+                      for name, other in commands.items()}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"stats: could not load {path} ({type(e).__name__}: {e}); starting with empty statistics",
+                  file=sys.stderr)
+            return False
+
+        with self.lock:
+            for name, other in loaded.items():
+                entry = self.commands.setdefault(name, {'count': 0, 'total': 0.0, 'max': 0.0,
+                                                        'buckets': [0] * BUCKET_COUNT})
+                entry['count'] += other['count']
+                entry['total'] += other['total']
+                entry['max'] = max(entry['max'], other['max'])
+                for bucket, count in enumerate(other['buckets']):
+                    entry['buckets'][bucket] += count
+        return True
+
+
+def _read_proc_io():
+    """Read/write syscall counts from /proc/self/io (Linux only)"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            fields = dict(line.split(':', 1) for line in f)
+        return int(fields['syscr']), int(fields['syscw'])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def time_call(function):
+    """Run function() and print wall time, CPU time, peak RSS and syscall counts"""
+    usage_before = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+    cpu_before = time.process_time()
+    io_before = _read_proc_io()
+    start = time.perf_counter()
+    try:
+        return function()
+    finally:
+        wall = time.perf_counter() - start
+        cpu = time.process_time() - cpu_before
+        io_after = _read_proc_io()
+
+        print(f"\nreal    {wall:.3f}s")
+        if usage_before is not None:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            # ru_maxrss is in kilobytes on Linux and bytes on macOS
+            max_rss = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+            print(f"user    {usage.ru_utime - usage_before.ru_utime:.3f}s")
+            print(f"sys     {usage.ru_stime - usage_before.ru_stime:.3f}s")
+            print(f"maxrss  {max_rss / (1 << 20):.1f} MB (process peak)")
+            print(f"ctxsw   {usage.ru_nvcsw - usage_before.ru_nvcsw} voluntary, "
+                  f"{usage.ru_nivcsw - usage_before.ru_nivcsw} involuntary")
+        else:
+            print(f"cpu     {cpu:.3f}s")
+        if io_before is not None and io_after is not None:
+            print(f"syscall {io_after[0] - io_before[0]} read, {io_after[1] - io_before[1]} write")
+
+
+def profile_call(function, limit=15, memory=False):
+    """Run function() under cProfile (or tracemalloc with memory=True) and print the top hotspots"""
+    if memory:
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        try:
+            return function()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+            print(f"\nTraced memory: {current / 1024:.1f} KiB now, {peak / 1024:.1f} KiB peak")
+            print(f"Top {limit} allocation sites:")
+            for stat in snapshot.statistics('lineno')[:limit]:
+                print(f"  {stat}")
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function)
+    finally:
+        output = io.StringIO()
+        # Own time, not cumulative: cumulative ranks the terminal's wrappers around the command first
+        pstats.Stats(profiler, stream=output).sort_stats('tottime', 'cumulative').print_stats(limit)
+        print(output.getvalue().rstrip())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Background job control for the terminal interface
+Commands ending in '&' run on a thread pool; finished jobs are reported at the next prompt.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_BACKGROUND_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+
+class Job:
+    """A command running (or queued) on the background thread pool"""
+
+    def __init__(self, job_id, command_line):
+        self.job_id = job_id
+        self.command_line = command_line
+        self.cancel = threading.Event()   # set by `kill`; streaming commands stop at the next line
+        self.future = None
+        self.status = None                # exit status once finished
+
+    @property
+    def state(self):
+        if self.future is None or not self.future.done():
+            return "Stopping" if self.cancel.is_set() else "Running"
+        if self.cancel.is_set():
+            return "Killed"
+        return "Done" if self.status == 0 else f"Exit {self.status}"
+
+    def __str__(self):
+        return f"[{self.job_id}]  {self.state:<10} {self.command_line}"
+
+
+class JobManager:
+    """Job table plus the thread pool that runs background commands"""
+
+    def __init__(self, max_workers=MAX_BACKGROUND_WORKERS):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = {}
+        self.finished = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.next_id = 1
+
+    def submit(self, command_line, function):
+        """Run function(job) in the background and return the new Job"""
+        with self.lock:
+            job = Job(self.next_id, command_line)
+            self.next_id += 1
+            self.jobs[job.job_id] = job
+
+        def run():
+            job.status = function(job)
+            return job.status
+
+        job.future = self.executor.submit(run)
+        job.future.add_done_callback(lambda future: self.finished.put(job))
+        return job
+
+    def get(self, spec=None):
+        """Look up a job by '%n' or 'n'; the most recent job when spec is None"""
+        with self.lock:
+            if spec is None:
+                return self.jobs[max(self.jobs)] if self.jobs else None
+            try:
+                return self.jobs.get(int(spec.lstrip('%')))
+            except ValueError:
+                return None
+
+    def list_jobs(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def forget(self, job):
+        """Drop a job from the job table without reporting it"""
+        with self.lock:
+            self.jobs.pop(job.job_id, None)
+
+    def collect_finished(self):
+        """Return jobs that finished since the last call and drop them from the job table"""
+        done = []
+        while True:
+            try:
+                job = self.finished.get_nowait()
+            except queue.Empty:
+                break
+            with self.lock:
+                if self.jobs.pop(job.job_id, None) is not None:
+                    done.append(job)
+        return done
+
+    def wait(self, job=None):
+        """Block until the given job (or every job) has finished"""
+        for waiting in ([job] if job is not None else self.list_jobs()):
+            try:
+                waiting.future.result()
+            except Exception:
+                pass
+
+    def shutdown(self):
+        """Ask every job to stop and wait for the workers to exit"""
+        for job in self.list_jobs():
+            job.cancel.set()
+        self.executor.shutdown(wait=True, cancel_futures=True)
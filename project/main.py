@@ -6,72 +6,413 @@ This simulates a basic terminal environment with common commands.
 
 import os
 import sys
+import argparse
 import subprocess
 import time
+from dataclasses import replace
 from pathlib import Path
 import threading
 
 # Import our new modules
-from filesystem import list_directory, change_directory, make_directory, remove_file, tree_directory
+from filesystem import (list_directory, change_directory, make_directory, remove_file, tree_directory,
+                        read_lines, disk_usage, copy_file, move_file, ExitStatus)
 from system_monitor import SystemMonitor
 from text_editor import NanoEditor
-from misc import exec_file, show_help
+from misc import exec_file, show_help, grep_lines
+from command_parser import parse_command_line, ParseError
+from jobs import JobManager
+from instrumentation import LatencyStats, time_call, profile_call
+from completion import Completer
+from file_viewer import cat_file, head_file, tail_file
+
+
+# Output buffer used in batch mode so that printing is not the bottleneck
+BATCH_BUFFER_SIZE = 1 << 20
+
+# Every built-in command name, used for tab completion
+BUILTIN_COMMANDS = ('ls', 'tree', 'cd', 'pwd', 'echo', 'grep', 'cat', 'head', 'tail', 'clear', 'history', 'mkdir', 'rm',
+                    'cp', 'mv', 'du', 'exec', 'help', 'jobs', 'fg', 'bg', 'wait', 'kill',
+                    'time', 'profile', 'stats', 'tools.dashboard', 'tools.editor', 'exit')
+
+# Built-ins that change terminal state or need the screen, so they cannot run with '&'
+FOREGROUND_ONLY = {'cd', 'clear', 'exit', 'jobs', 'fg', 'bg', 'wait', 'kill',
+                   'tools.dashboard', 'tools.editor'}
 
 
 class SimpleTerminal:
-    def __init__(self):
-        self.current_path = Path.cwd()
+    def __init__(self, interactive=True):
+        # Background jobs keep their own working directory and exit status in thread-local state
+        self._local = threading.local()
+        self._current_path = Path.cwd()
+        self._last_status = 0
         self.history = []
+        self.interactive = interactive
 
         self.system_monitor = SystemMonitor()
         self.editor = NanoEditor(self.current_path)
+        self.jobs = JobManager()
+        self.stats = LatencyStats()
+        self.completer = Completer(BUILTIN_COMMANDS, lambda: self.current_path)
+
+    @property
+    def current_job(self):
+        """The Job being run by the current thread, or None in the foreground"""
+        return getattr(self._local, 'job', None)
+
+    @property
+    def current_path(self):
+        return getattr(self._local, 'current_path', self._current_path)
+
+    @current_path.setter
+    def current_path(self, path):
+        if self.current_job is not None:
+            self._local.current_path = path
+        else:
+            self._current_path = path
+
+    @property
+    def last_status(self):
+        return getattr(self._local, 'last_status', self._last_status)
+
+    @last_status.setter
+    def last_status(self, status):
+        if self.current_job is not None:
+            self._local.last_status = status
+        else:
+            self._last_status = status
+
+    def stream_command(self, command, args, stdin=None, tty=False, status=None):
+        """
+        Return a generator of output lines for built-ins that can take part in pipes and
+        redirection, or None for any other command. Nothing runs until the lines are consumed;
+        failures are recorded in `status` (an ExitStatus) while they are.
+        """
+        match command:
+            case 'ls': return list_directory(self.current_path, args, tty=tty, status=status)
+            case 'tree': return tree_directory(self.current_path, args, tty=tty, status=status)
+            case 'pwd': return iter([str(self.current_path)])
+            case 'echo': return iter([" ".join(args)])
+            case 'history': return (f"{i:3d}  {cmd}" for i, cmd in enumerate(self.history, 1))
+            case 'grep': return grep_lines(self.current_path, args, stdin, status)
+            case 'cat': return cat_file(self.current_path, args, stdin, status)
+            case 'head': return head_file(self.current_path, args, stdin, status)
+            case 'tail':
+                job = self.current_job
+                return tail_file(self.current_path, args, stdin, stop=job.cancel if job else None,
+                                 status=status)
+            case 'du':
+                job = self.current_job
+                return disk_usage(self.current_path, args, status, stop=job.cancel if job else None)
+            case 'jobs': return (str(job) for job in self.jobs.list_jobs())
+            case 'stats' if not args: return self.stats.lines()
+        return None
+
+    def write_lines(self, lines, out, status=None):
+        """
+        Write lines to a stream one at a time, so a pipeline never holds more than one line.
+        The stream is flushed whenever a stage reports through `status` that it is waiting for
+        input (e.g. tail -f). In a background job, stops early once the job has been killed.
+        """
+        if status is not None:
+            status.on_idle = out.flush
+        write = out.write
+        job = self.current_job
+        if job is None:
+            for line in lines:
+                write(line)
+                write('\n')
+            return
+
+        for line in lines:
+            if job.cancel.is_set():
+                self.last_status = 143
+                return
+            write(line)
+            write('\n')
 
     def run_command(self, command, args):
+        """Run a single built-in command. Returns False when the terminal should exit."""
+        self.last_status = 0
         try:
+            status = ExitStatus()
+            lines = self.stream_command(command, args, tty=sys.stdout.isatty(), status=status)
+            if lines is not None:
+                self.write_lines(lines, sys.stdout, status)
+                self.last_status = self.last_status or status.code
+                return True
+
             match command:
-                case 'ls': list_directory(self.current_path, args)
-                case 'tree': tree_directory(self.current_path, args)
-                case 'cd': self.current_path = change_directory(self.current_path, args)
-                case 'pwd': print(self.current_path)
-                case 'echo': print(" ".join(args))
+                case 'cd':
+                    new_path = change_directory(self.current_path, args)
+                    if new_path is None: self.last_status = 1
+                    else: self.current_path = new_path
                 case 'clear': os.system('cls' if os.name == 'nt' else 'clear')
-                case 'history':
-                    for i, cmd in enumerate(self.history, 1):
-                        print(f"{i:3d}  {cmd}")
-                case 'mkdir': make_directory(self.current_path, args)
-                case 'rm': remove_file(self.current_path, args)
+                case 'mkdir':
+                    if not make_directory(self.current_path, args): self.last_status = 1
+                case 'rm':
+                    interactive = self.interactive and self.current_job is None
+                    if not remove_file(self.current_path, args, interactive): self.last_status = 1
+                case 'cp':
+                    if not copy_file(self.current_path, args, self.current_job is None): self.last_status = 1
+                case 'mv':
+                    if not move_file(self.current_path, args, self.current_job is None): self.last_status = 1
                 case 'exec':
                     if not args:
                         print("exec: missing argument")
-                    else:
-                        exec_file(self, self.current_path, args[0])
+                        self.last_status = 2
+                    elif not exec_file(self, self.current_path, args[0]):
+                        self.last_status = 1
                 case 'help': show_help()
                 case 'tools.dashboard':
-                    self.system_monitor.start_dashboard()
+                    try:
+                        self.system_monitor.start_dashboard()
+                    except KeyboardInterrupt:
+                        os.system('cls' if os.name == 'nt' else 'clear')
+                        print("\nDashboard stopped.")
                 case 'tools.editor':
                     if not args:
                         print("Usage: edit <filename>")
                     else:
                         editor = NanoEditor(self.current_path / args[0])
                         editor.run()
+                case 'fg' | 'bg' | 'wait' | 'kill':
+                    self.job_control(command, args)
+                case 'stats':
+                    if args == ['--reset']:
+                        self.stats.reset()
+                    elif len(args) == 2 and args[0] == '--export':
+                        self.stats.export(self.current_path / args[1])
+                        print(f"Stats written to {args[1]}")
+                    else:
+                        print("Usage: stats [--reset | --export <file>]")
+                        self.last_status = 2
                 case 'exit':
-                    print("Goodbye!")
+                    if self.interactive: print("Goodbye!")
                     return False
+                case _:
+                    print(f"{command}: command not found")
+                    self.last_status = 127
             return True
+        except BrokenPipeError:
+            raise
         except Exception as e:
             print(f"Error: {e}")
+            self.last_status = 1
             return True
 
+    def job_control(self, command, args):
+        """Handle the fg, bg, wait and kill built-ins"""
+        if command == 'wait' and not args:
+            self.jobs.wait()
+            return
+
+        if command == 'kill' and not args:
+            print("kill: usage: kill %<job>")
+            self.last_status = 2
+            return
+
+        job = self.jobs.get(args[0] if args else None)
+        if job is None:
+            print(f"{command}: {args[0] if args else 'current'}: no such job")
+            self.last_status = 1
+            return
+
+        match command:
+            case 'fg' | 'wait':
+                if command == 'fg': print(job.command_line)
+                self.jobs.wait(job)
+                self.jobs.forget(job)
+                self.last_status = 143 if job.cancel.is_set() else (job.status or 0)
+            case 'bg':
+                if job.future.done():
+                    print(f"bg: job {job.job_id} has already finished")
+                    self.last_status = 1
+                else:
+                    print(f"[{job.job_id}]  {job.command_line} &")
+            case 'kill':
+                if job.future.done():
+                    print(f"kill: job {job.job_id} has already finished")
+                    self.last_status = 1
+                else:
+                    job.cancel.set()
+
+    def start_job(self, pipeline):
+        """Run a pipeline on the background thread pool with a snapshot of the working directory"""
+        for argv in pipeline.stages:
+            # Look through `time`/`profile` prefixes to the command that actually runs
+            command = argv[0].lower()
+            while command in ('time', 'profile'):
+                argv = self.measured_options(command, argv[1:])[0]
+                command = argv[0].lower() if argv else ''
+            if command in FOREGROUND_ONLY:
+                print(f"{command}: cannot run in the background")
+                self.last_status = 2
+                return
+
+        current_path = self.current_path
+
+        def run(job):
+            self._local.job = job
+            self._local.current_path = current_path
+            self._local.last_status = 0
+            try:
+                self.run_pipeline(pipeline)
+                return self.last_status
+            finally:
+                del self._local.job
+
+        job = self.jobs.submit(str(pipeline), run)
+        if self.interactive: print(f"[{job.job_id}] started")
+        self.last_status = 0
+
+    def report_jobs(self):
+        """Print a line for every background job that finished since the last prompt"""
+        for job in self.jobs.collect_finished():
+            print(job)
+
+    def run_pipeline(self, pipeline):
+        """
+        Run a parsed pipeline and record its latency. Returns False when the terminal should exit.
+        """
+        command = pipeline.stages[0][0].lower()
+        if command in ('time', 'profile'):
+            return self.run_measured(command, pipeline)
+
+        start = time.perf_counter()
+        try:
+            return self._run_pipeline(pipeline)
+        finally:
+            self.stats.record(pipeline.name(), time.perf_counter() - start)
+
+    @staticmethod
+    def measured_options(command, args):
+        """Split the arguments of `time <cmd>` or `profile [-m] [-n N] <cmd>` into (argv, limit, memory)"""
+        argv = list(args)
+        limit, memory = 15, False
+        while command == 'profile' and argv and argv[0].startswith('-'):
+            option = argv.pop(0)
+            if option == '-m':
+                memory = True
+            elif option == '-n' and argv and argv[0].isdigit():
+                limit = int(argv.pop(0))
+            else:
+                return [], limit, memory
+        return argv, limit, memory
+
+    def run_measured(self, command, pipeline):
+        """Run the rest of a `time <cmd>` or `profile [-m] [-n N] <cmd>` pipeline under measurement"""
+        argv, limit, memory = self.measured_options(command, pipeline.stages[0][1:])
+        if not argv:
+            print("Usage: time <command>" if command == 'time' else "Usage: profile [-m] [-n N] <command>")
+            self.last_status = 2
+            return True
+
+        inner = replace(pipeline, stages=[argv] + pipeline.stages[1:])
+        if command == 'time':
+            return time_call(lambda: self.run_pipeline(inner))
+        return profile_call(lambda: self.run_pipeline(inner), limit, memory)
+
+    def _run_pipeline(self, pipeline):
+        """
+        Each stage consumes the previous stage's generator lazily, so lines stream from
+        producer to consumer (or file) without being collected in memory.
+        """
+        if pipeline.is_simple():
+            command, *args = pipeline.stages[0]
+            return self.run_command(command.lower(), args)
+
+        self.last_status = 0
+        status = ExitStatus()   # shared by every stage: the pipeline fails if any stage does
+        try:
+            lines = None
+            if pipeline.stdin is not None:
+                lines = read_lines(self.current_path / pipeline.stdin)
+            for command, *args in pipeline.stages:
+                lines = self.stream_command(command.lower(), args, lines, status=status)
+                if lines is None:
+                    print(f"{command}: cannot be used in a pipeline or with redirection")
+                    self.last_status = 2
+                    return True
+
+            if pipeline.stdout is not None:
+                with open(self.current_path / pipeline.stdout, 'a' if pipeline.append else 'w') as out:
+                    self.write_lines(lines, out, status)
+            else:
+                self.write_lines(lines, sys.stdout, status)
+            self.last_status = self.last_status or status.code
+        except BrokenPipeError:
+            raise
+        except Exception as e:
+            print(f"Error: {e}")
+            self.last_status = 1
+        return True
+
+    def execute_line(self, command_line, report=None):
+        """
+        Parse a command line and run each of its ';'-separated pipelines.
+        Returns False when the terminal should exit.
+        If `report` is a stream, the exit status of each pipeline is written to it.
+        """
+        try:
+            pipelines = parse_command_line(command_line)
+        except ParseError as e:
+            print(f"Parse error: {e}")
+            self.last_status = 2
+            return True
+
+        for pipeline in pipelines:
+            if pipeline.background:
+                self.start_job(pipeline)
+                keep_going = True
+            else:
+                keep_going = self.run_pipeline(pipeline)
+            if report is not None:
+                report.write(f"{self.last_status}\t{pipeline}\n")
+            if not keep_going: return False
+        return True
+
+    def run_batch(self, lines, report=None):
+        """
+        Run commands without a prompt or history, e.g. from `-c`, a script file or piped stdin.
+        Output goes through a large buffered writer; if `report` is a stream, the exit status of
+        every command is written to it. Returns the status of the last command, or 141 when the
+        reader of our output went away (e.g. `| head`), which stops the remaining commands.
+        Like `sh -c`, the batch does not wait for background jobs: any still running at the end
+        are stopped as by `kill`, so scripts that need their results end with `wait`.
+        """
+        stdout = sys.stdout
+        sys.stdout = open(stdout.fileno(), 'w', buffering=BATCH_BUFFER_SIZE,
+                          encoding=stdout.encoding, errors='replace', closefd=False)
+        try:
+            for line in lines:
+                command_line = line.strip()
+                if not command_line or command_line.startswith('#'): continue
+
+                if not self.execute_line(command_line, report): break
+            sys.stdout.flush()
+        except KeyboardInterrupt:
+            self.last_status = 130
+        except BrokenPipeError:
+            # Send whatever is still buffered to /dev/null so the final flush cannot fail again
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, stdout.fileno())
+            os.close(devnull)
+            self.last_status = 141
+        finally:
+            self.jobs.shutdown()
+            sys.stdout.flush()
+            sys.stdout = stdout
+        return self.last_status
+
     def run(self):
         print("Simple Terminal Interface")
         print("Type 'help' for available commands or 'exit' to quit.")
         print("-" * 70)
+        self.completer.install()
 
         while True:
             try:
-                if self.system_monitor.running:
-                    time.sleep(1)
-                    continue
+                self.report_jobs()
 
                 prompt = f"{self.current_path.name}$ "
                 command_line = input(prompt).strip()
@@ -79,26 +420,49 @@ class SimpleTerminal:
                 if not command_line: continue
 
                 self.history.append(command_line)
-                parts = command_line.split()
-                cmd, args = parts[0].lower(), parts[1:]
-
-                if not self.run_command(cmd, args): break
+                if not self.execute_line(command_line): break
 
             except KeyboardInterrupt:
-                if self.system_monitor.dashboard_active:
-                    self.system_monitor.stop_dashboard()
-                    time.sleep(0.1)
-                    os.system('cls' if os.name == 'nt' else 'clear')
-                    print("\nDashboard stopped.")
-                else:
-                    print("\nUse 'exit' to quit.")
+                print("\nUse 'exit' to quit.")
             except EOFError:
                 print("\nGoodbye!")
                 break
 
-def main():
-    terminal = SimpleTerminal()
-    terminal.run()
+        self.jobs.shutdown()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simple Terminal Interface")
+    parser.add_argument('-c', dest='command', metavar='COMMANDS',
+                        help="run ';'-separated commands and exit")
+    parser.add_argument('--report', action='store_true',
+                        help="write the exit status of every command to stderr (batch mode)")
+    parser.add_argument('--stats-file', metavar='PATH',
+                        help="accumulate per-command latency stats in this JSON file across sessions")
+    parser.add_argument('script', nargs='?', help="file of commands to run and exit")
+    options = parser.parse_args(argv)
+
+    interactive = options.command is None and options.script is None and sys.stdin.isatty()
+    terminal = SimpleTerminal(interactive=interactive)
+    if options.stats_file and os.path.exists(options.stats_file):
+        terminal.stats.merge(options.stats_file)
+
+    report = sys.stderr if options.report else None
+    try:
+        if interactive:
+            terminal.run()
+            return 0
+        if options.command is not None:
+            return terminal.run_batch(options.command.splitlines(), report)
+        if options.script is not None:
+            with open(options.script, 'r') as f:
+                return terminal.run_batch(f, report)
+        return terminal.run_batch(sys.stdin, report)
+    finally:
+        if options.stats_file:
+            try:
+                terminal.stats.export(options.stats_file)
+            except OSError as e:
+                print(f"stats: could not write {options.stats_file}: {e.strerror}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
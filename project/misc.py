@@ -4,9 +4,12 @@ Miscellaneous commands for the terminal interface
 """
 
 import os
+import re
 import runpy
 from pathlib import Path
 
+from filesystem import read_lines, ExitStatus
+
 
 def exec_python_file(current_path, file_path):
     """Execute a Python file safely in its own namespace"""
@@ -62,11 +65,8 @@ def exec_shell_file(terminal_instance, current_path, file_path):
             if not line or line.startswith('#'):
                 continue
 
-            parts = line.split()
-            cmd = parts[0]
-            args = parts[1:]
-
-            terminal_instance.run_command(cmd, args)
+            if not terminal_instance.execute_line(line):
+                break
 
         print("-" * 70)
         print("Script execution completed.")
@@ -93,6 +93,76 @@ def exec_file(terminal_instance, current_path, file_path):
         return False
 
 
+def grep_lines(current_path, args, stdin=None, status=None):
+    """
+    Yield the lines matching a regular expression, read from the given files or from stdin.
+    Options: -i ignore case, -v select non-matching lines (combinable as -iv), -e PATTERN for a
+    pattern starting with '-'; '--' ends the options.
+    Like grep, the status is 1 when nothing matched or a file could not be read, 2 for usage errors.
+    """
+    status = status or ExitStatus()
+    flags, operands, expression = "", [], None
+    args = list(args)
+    while args:
+        arg = args.pop(0)
+        if arg == '--':
+            operands.extend(args)
+            break
+        if arg.startswith('-e'):
+            if len(arg) == 2 and not args:
+                print("grep: option requires an argument -- 'e'")
+                status.fail(2)
+                return
+            expression = arg[2:] or args.pop(0)
+        elif arg.startswith('-') and arg != '-':
+            flags += arg[1:]
+        else:
+            operands.append(arg)
+    if set(flags) - set('iv'):
+        print(f"grep: invalid option -- '{(set(flags) - set('iv')).pop()}'")
+        status.fail(2)
+        return
+    if expression is None:
+        if not operands:
+            print("grep: missing pattern")
+            status.fail(2)
+            return
+        expression = operands.pop(0)
+
+    try:
+        pattern = re.compile(expression, re.IGNORECASE if 'i' in flags else 0)
+    except re.error as e:
+        print(f"grep: invalid pattern: {e}")
+        status.fail(2)
+        return
+    invert = 'v' in flags
+    files = operands
+    matched = False
+
+    if files:
+        for file_name in files:
+            try:
+                for line in read_lines(current_path / file_name):
+                    if bool(pattern.search(line)) != invert:
+                        matched = True
+                        yield f"{file_name}:{line}" if len(files) > 1 else line
+            except OSError as e:
+                print(f"grep: {file_name}: {e.strerror}")
+                status.fail()
+    elif stdin is not None:
+        for line in stdin:
+            if bool(pattern.search(line)) != invert:
+                matched = True
+                yield line
+    else:
+        print("grep: no input (use a file or a pipe)")
+        status.fail(2)
+        return
+
+    if not matched:
+        status.fail()
+
+
 def show_help():
     """Display available commands"""
     help_text = """
@@ -103,12 +173,31 @@ Available commands:
   cd        - Change directory
   pwd       - Print working directory
   echo      - Display a line of text
+  cat       - Print files (cat [files])
+  head      - Print the first lines of files (head [-n N] [files])
+  tail      - Print the last lines of files; -f follows appends (tail [-n [+]N] [-f] [file])
+  grep      - Print lines matching a pattern (grep [-iv] [-e] <pattern> [files])
   clear     - Clear the screen
   history   - Show command history
   mkdir     - Create directories
-  rm        - Remove files and directories
+  rm        - Remove files and directories (-r: directories without asking, -f: never ask)
+  cp        - Copy files (cp [-r] <src>... <dst>)
+  mv        - Move or rename files and directories (mv <src>... <dst>)
+  du        - Show disk usage (du [-s] [-h] [dir])
   exec      - Execute Python (.py) and shell (.sh) files
   dashboard - Show system monitoring dashboard
+  jobs      - List background jobs
+  fg/wait   - Wait for a background job (fg [%n], wait [%n])
+  bg        - Show that a job is running in the background
+  kill      - Stop a background job (kill %n)
+  time      - Report wall/CPU time, peak RSS and syscalls of a command (time <cmd>)
+  profile   - Show a command's hotspots (profile [-m] [-n N] <cmd>; -m traces memory)
+  stats     - Show per-command latency stats (stats [--reset | --export <file>])
   exit      - Exit the terminal
+
+Commands that print lines (ls, tree, pwd, echo, history, grep, cat, head,
+tail, du, jobs, stats) can be
+combined with pipes and redirection, e.g.  tree | grep py > out.txt
+Append '&' to run a command in the background, e.g.  du -s -h . &
     """
     print(help_text.strip())
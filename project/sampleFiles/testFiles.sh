@@ -6,4 +6,4 @@ cd ..
 tree
 echo Showing Files
 ls
-rm test_directory
+rm -r test_directory
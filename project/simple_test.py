@@ -24,11 +24,13 @@ try:
     
     # Test simple listing
     print("Simple listing:")
-    list_directory(current_path, [])
+    for line in list_directory(current_path, []):
+        print(line)
     
     # Test long listing
     print("\nLong listing:")
-    list_directory(current_path, ['-l'])
+    for line in list_directory(current_path, ['-l']):
+        print(line)
     
 except Exception as e:
     print(f"Error during testing: {e}")
@@ -192,24 +192,30 @@ class SystemMonitor:
     def start_dashboard(self):
         """Entry point to start the curses dashboard loop."""
         self.running = True
-        # Wrapper handles terminal setup and restoration
-        curses.wrapper(self._dashboard_loop)
+        try:
+            # Wrapper handles terminal setup and restoration
+            curses.wrapper(self._dashboard_loop)
+        finally:
+            self.running = False
 
     def _dashboard_loop(self, stdscr):
         """The main loop that handles drawing, timing, and input."""
         curses.curs_set(0) # Hide the cursor
-        stdscr.nodelay(True) # Non-blocking input
+        # Wait for input for at most one update interval, so a key press is handled immediately
+        stdscr.timeout(int(self.update_interval * 1000))
         self._init_colors()
 
         # Call once before the loop to initialize psutil's cpu_percent
         psutil.cpu_percent(interval=None)
 
+        self.draw_dashboard(stdscr)
         while self.running:
-            # Handle user input
+            # Handle user input (or time out after update_interval)
             try:
                 key = stdscr.getch()
                 if key == 24: # Ctrl+X
                     self.running = False
+                    break
                 elif key == ord('c'):
                     self.sort_key = 'cpu_percent'
                 elif key == ord('m'):
@@ -223,9 +229,6 @@ class SystemMonitor:
 
             # Draw the screen
             self.draw_dashboard(stdscr)
-            
-            # Wait for the next update
-            time.sleep(self.update_interval)
 
     def stop_dashboard(self):
         self.running = False
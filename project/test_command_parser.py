@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for command-line parsing (run with `python -m pytest` from this directory)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from command_parser import tokenize, parse_command_line, ParseError, Pipeline
+
+
+def words(command_line):
+    return [value for kind, value in tokenize(command_line) if kind == 'word']
+
+
+def test_quoting_and_escapes():
+    assert words("echo 'a b' \"c d\" e\\ f") == ['echo', 'a b', 'c d', 'e f']
+    assert words("echo \"say \\\"hi\\\" \\\\ \\n\"") == ['echo', 'say "hi" \\ \\n']
+    assert words("echo 'no $escapes\\'") == ['echo', 'no $escapes\\']
+    assert words("echo '' \"\"") == ['echo', '', '']
+    assert words("echo a'b'\"c\"") == ['echo', 'abc']
+
+
+def test_quoted_operators_are_words():
+    [pipeline] = parse_command_line("echo 'a|b' \"c > d\" e\\;f")
+    assert pipeline.stages == [['echo', 'a|b', 'c > d', 'e;f']]
+    assert pipeline.is_simple()
+
+
+def test_unterminated_quotes():
+    with pytest.raises(ParseError):
+        tokenize("echo 'abc")
+    with pytest.raises(ParseError):
+        tokenize('echo "abc')
+
+
+def test_append_and_truncate_redirection():
+    [pipeline] = parse_command_line("ls>>out.txt")
+    assert (pipeline.stdout, pipeline.append) == ('out.txt', True)
+    [pipeline] = parse_command_line("ls > out.txt")
+    assert (pipeline.stdout, pipeline.append) == ('out.txt', False)
+    with pytest.raises(ParseError):
+        parse_command_line("ls > > out.txt")
+
+
+def test_pipes_and_input_redirection():
+    [pipeline] = parse_command_line("cat<x|grep y")
+    assert pipeline.stages == [['cat'], ['grep', 'y']]
+    assert pipeline.stdin == 'x'
+    assert pipeline.name() == 'cat | grep'
+    with pytest.raises(ParseError):
+        parse_command_line("cat x | grep y < z")
+    with pytest.raises(ParseError):
+        parse_command_line("ls > out | grep y")
+    with pytest.raises(ParseError):
+        parse_command_line("| grep y")
+    with pytest.raises(ParseError):
+        parse_command_line("ls |")
+
+
+def test_separators_and_background():
+    pipelines = parse_command_line("echo a; echo b & echo c")
+    assert [p.stages for p in pipelines] == [[['echo', 'a']], [['echo', 'b']], [['echo', 'c']]]
+    assert [p.background for p in pipelines] == [False, True, False]
+
+    # Empty commands between ';' are skipped, a trailing '&' makes the last one a job
+    pipelines = parse_command_line(";; echo a ;; tail -f log &")
+    assert [p.background for p in pipelines] == [False, True]
+    assert parse_command_line("   ") == []
+
+    with pytest.raises(ParseError):
+        parse_command_line("&")
+    with pytest.raises(ParseError):
+        parse_command_line("echo a & &")
+    with pytest.raises(ParseError):
+        parse_command_line("> out.txt")
+
+
+@pytest.mark.parametrize('command_line', [
+    "cat<x|grep y",
+    "cat < 'my file' | sort | head -n 3 >> out.txt &",
+    "grep 'a b' \"it's\" > 'out put'",
+    "echo a\\;b",
+])
+def test_str_parses_back_to_the_same_pipeline(command_line):
+    for pipeline in parse_command_line(command_line):
+        assert parse_command_line(str(pipeline)) == [pipeline]
+
+
+def test_str_puts_input_redirection_on_the_first_command():
+    pipeline = Pipeline(stages=[['cat'], ['grep', 'y']], stdin='x')
+    assert str(pipeline) == "cat < x | grep y"
+
+
+def test_plain_lines_split_on_whitespace():
+    assert tokenize("  echo\thello   world ") == [('word', 'echo'), ('word', 'hello'), ('word', 'world')]
+    [pipeline] = parse_command_line("ls -l src")
+    assert pipeline == Pipeline(stages=[['ls', '-l', 'src']])
+    assert parse_command_line(" \t ") == []
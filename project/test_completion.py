@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for tab completion quoting (run with `python -m pytest` from this directory)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from command_parser import tokenize
+from completion import Completer, current_word, quote_word
+
+
+@pytest.fixture
+def completer(tmp_path):
+    for name in ('my dir', 'a&b', 'docs'):
+        (tmp_path / name).mkdir()
+    for name in ("it's.txt", 'say "hi".txt', 'plain.txt'):
+        (tmp_path / name).touch()
+    return Completer(['cat', 'cd', 'ls'], lambda: tmp_path)
+
+
+def complete(completer, line):
+    """Complete like readline does: the replaced text starts after the last delimiter"""
+    begin = max(line.rfind(char) for char in ' \t\n;|&<>') + 1
+    return [line[:begin] + match for match in completer.candidates(line, begin)]
+
+
+@pytest.mark.parametrize('line, expected', [
+    ("cd my", (3, '', 'my')),
+    ("cd my\\ d", (3, '', 'my d')),
+    ("cat 'it", (4, "'", 'it')),
+    ('cat "say \\"h', (4, '"', 'say "h')),
+    ("ls a\\&", (3, '', 'a&')),
+    ("ls docs; cat ", (13, '', '')),
+])
+def test_current_word(line, expected):
+    assert current_word(line) == expected
+
+
+@pytest.mark.parametrize('path, quote, is_dir, expected', [
+    ('my dir', '', True, 'my\\ dir/'),
+    ("it's.txt", '', False, "it\\'s.txt "),
+    ("it's.txt", "'", False, "'it'\\''s.txt' "),
+    ('say "hi".txt', '"', False, '"say \\"hi\\".txt" '),
+    ('a&b', '', True, 'a\\&b/'),
+])
+def test_quote_word(path, quote, is_dir, expected):
+    assert quote_word(path, quote, is_dir) == expected
+
+
+@pytest.mark.parametrize('line, expected', [
+    ("cd my", ["cd my\\ dir/"]),
+    ("cd my\\ d", ["cd my\\ dir/"]),
+    ('cd "my d', ['cd "my dir/']),
+    ("cat it", ["cat it\\'s.txt "]),
+    ("cat 'it", ["cat 'it'\\''s.txt' "]),
+    ('cat "say', ['cat "say \\"hi\\".txt" ']),
+    ("ls a", ["ls a\\&b/"]),
+    ("ls a\\&", ["ls a\\&b/"]),
+    ("ca", ["cat "]),
+    ("ls | c", ["ls | cat ", "ls | cd "]),
+])
+def test_completions(completer, line, expected):
+    assert complete(completer, line) == expected
+
+
+@pytest.mark.parametrize('line', ["cat it", "cat 'it", 'cat "say', "ls my\\ d", "ls a\\&"])
+def test_completed_words_parse_back_to_the_name(completer, line):
+    for completed in complete(completer, line):
+        name = tokenize(completed)[-1][1].rstrip('/')
+        assert os.path.exists(completer.get_current_path() / name)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for tail in file_viewer.py (run with `python -m pytest` from this directory)
+"""
+
+import sys
+import os
+import threading
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+
+from filesystem import ExitStatus
+from file_viewer import _tail_offset, _follow, tail_file
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return path
+
+
+def tail(path, *args):
+    status = ExitStatus()
+    return list(tail_file(path.parent, [*args, path.name], status=status)), status.code
+
+
+@pytest.mark.parametrize('data, count, expected', [
+    (b"a\nb\nc\n", 2, b"b\nc\n"),       # trailing newline ends the last line
+    (b"a\nb\nc", 2, b"b\nc"),           # no trailing newline
+    (b"a\nb\nc\n", 10, b"a\nb\nc\n"),   # more lines asked for than the file has
+    (b"a\nb\nc\n", 0, b""),
+    (b"\n\n\n", 2, b"\n\n"),            # empty lines count as lines
+    (b"", 3, b""),
+])
+def test_tail_offset(tmp_path, data, count, expected):
+    path = write(tmp_path / 'log', data)
+    assert data[_tail_offset(path, count):] == expected
+
+
+def test_tail_lines(tmp_path):
+    path = write(tmp_path / 'log', b"".join(b"%d\n" % i for i in range(1, 13)))
+    assert tail(path) == ([str(i) for i in range(3, 13)], 0)
+    assert tail(path, '-n', '2') == (['11', '12'], 0)
+    assert tail(path, '-n0') == ([], 0)
+    assert tail(path, '-n', '+11') == (['11', '12'], 0)
+    assert tail(path, '-n', '+0') == ([str(i) for i in range(1, 13)], 0)
+
+
+def test_tail_from_start_of_stdin():
+    lines = list(tail_file(None, ['-n', '+2'], stdin=iter(['a', 'b', 'c'])))
+    assert lines == ['b', 'c']
+
+
+def test_tail_usage_errors(tmp_path):
+    path = write(tmp_path / 'log', b"a\n")
+    assert tail(path, '-n', 'x') == ([], 2)
+    assert tail(path, '-n', '-3') == ([], 2)
+    assert tail(path, '-q') == ([], 2)
+
+
+def follow(path, offset):
+    stop = threading.Event()
+    return _follow(path, offset, ExitStatus(), stop), stop
+
+
+def test_follow_appended_and_partial_lines(tmp_path):
+    path = write(tmp_path / 'log', b"old\n")
+    lines, stop = follow(path, 4)
+    with open(path, 'ab') as f:
+        f.write(b"new 1\nnew 2\npart")
+    assert [next(lines), next(lines)] == ['new 1', 'new 2']
+    with open(path, 'ab') as f:
+        f.write(b"ial\n")
+    assert next(lines) == 'partial'
+    stop.set()
+    lines.close()
+
+
+def test_follow_truncation(tmp_path, capsys):
+    path = write(tmp_path / 'log', b"a long first line\n")
+    lines, stop = follow(path, 0)
+    assert next(lines) == 'a long first line'   # the file is open from here on
+    write(path, b"short\n")
+    assert next(lines) == 'short'
+    assert "file truncated" in capsys.readouterr().out
+    lines.close()
+
+
+def test_follow_rotation(tmp_path, capsys):
+    path = write(tmp_path / 'log', b"first\n")
+    lines, stop = follow(path, 0)
+    assert next(lines) == 'first'
+    os.rename(path, tmp_path / 'log.1')
+    write(path, b"second\n")
+    assert next(lines) == 'second'
+    assert "has been replaced" in capsys.readouterr().out
+    lines.close()
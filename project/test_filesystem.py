@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for the cp/mv operand handling in filesystem.py (run with `python -m pytest` from this directory)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from filesystem import _copy_targets, copy_file
+
+
+def make_files(root, *names):
+    for name in names:
+        (root / name).write_text(name)
+
+
+def test_missing_operand(tmp_path, capsys):
+    assert _copy_targets(tmp_path, 'cp', ['a']) == ([], False)
+    assert "missing file operand" in capsys.readouterr().out
+
+
+def test_single_file(tmp_path):
+    make_files(tmp_path, 'a')
+    assert _copy_targets(tmp_path, 'cp', ['a', 'b']) == ([(tmp_path / 'a', tmp_path / 'b')], True)
+
+
+def test_into_directory(tmp_path):
+    make_files(tmp_path, 'a', 'b')
+    (tmp_path / 'dir').mkdir()
+    pairs, ok = _copy_targets(tmp_path, 'cp', ['a', 'b', 'dir'])
+    assert ok
+    assert pairs == [(tmp_path / 'a', tmp_path / 'dir' / 'a'), (tmp_path / 'b', tmp_path / 'dir' / 'b')]
+
+
+def test_several_sources_need_a_directory(tmp_path, capsys):
+    make_files(tmp_path, 'a', 'b', 'c')
+    assert _copy_targets(tmp_path, 'cp', ['a', 'b', 'c']) == ([], False)
+    assert "is not a directory" in capsys.readouterr().out
+
+
+def test_missing_source_is_skipped(tmp_path, capsys):
+    make_files(tmp_path, 'a')
+    (tmp_path / 'dir').mkdir()
+    pairs, ok = _copy_targets(tmp_path, 'mv', ['nope', 'a', 'dir'])
+    assert not ok
+    assert pairs == [(tmp_path / 'a', tmp_path / 'dir' / 'a')]
+    assert "mv: nope: No such file or directory" in capsys.readouterr().out
+
+
+def test_same_file(tmp_path, capsys):
+    make_files(tmp_path, 'a')
+    assert _copy_targets(tmp_path, 'cp', ['a', '.']) == ([], False)
+    assert "are the same file" in capsys.readouterr().out
+
+
+def test_directory_into_itself(tmp_path, capsys):
+    (tmp_path / 'dir' / 'sub').mkdir(parents=True)
+    assert _copy_targets(tmp_path, 'cp', ['dir', 'dir/sub']) == ([], False)
+    assert "into itself" in capsys.readouterr().out
+
+
+def test_copy_tree_with_combined_flags(tmp_path, capsys):
+    (tmp_path / 'src' / 'sub').mkdir(parents=True)
+    make_files(tmp_path / 'src' / 'sub', 'f')
+    os.mkfifo(tmp_path / 'src' / 'pipe')
+    assert copy_file(tmp_path, ['-rf', 'src', 'dst'], show_progress=False)
+    assert (tmp_path / 'dst' / 'sub' / 'f').read_text() == 'f'
+    assert (tmp_path / 'dst' / 'pipe').is_fifo()
+
+    assert not copy_file(tmp_path, ['-rx', 'src', 'other'], show_progress=False)
+    assert "invalid option -- 'x'" in capsys.readouterr().out
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for grep option handling in misc.py (run with `python -m pytest` from this directory)
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from filesystem import ExitStatus
+from misc import grep_lines
+
+
+def grep(args, lines):
+    status = ExitStatus()
+    return list(grep_lines(None, args, iter(lines), status)), status.code
+
+
+def test_combined_flags():
+    assert grep(['-iv', 'alpha'], ['Alpha', 'beta']) == (['beta'], 0)
+    assert grep(['-i', '-v', 'alpha'], ['Alpha', 'beta']) == (['beta'], 0)
+
+
+def test_pattern_starting_with_dash():
+    assert grep(['-e', '-x'], ['-x-', 'y']) == (['-x-'], 0)
+    assert grep(['-e-x'], ['-x-', 'y']) == (['-x-'], 0)
+    assert grep(['--', '-x'], ['-x-', 'y']) == (['-x-'], 0)
+
+
+def test_usage_errors(capsys):
+    assert grep(['-c', '1'], ['1']) == ([], 2)
+    assert "invalid option -- 'c'" in capsys.readouterr().out
+    assert grep(['-e'], ['1']) == ([], 2)
+    assert grep([], ['1']) == ([], 2)
+    assert grep(['('], ['1']) == ([], 2)
+
+
+def test_no_match_is_status_1():
+    assert grep(['z'], ['a', 'b']) == ([], 1)